@@ -1,39 +1,78 @@
 import math
+import operator
 import re
 
+_RAD2DEG = 180.0 / math.pi
+
+_CELL_KEYS = {
+    f"{p}cell{q}{name}": name
+    for p in "_*" for q in "_*"
+    for name in ('length_a', 'length_b', 'length_c', 'angle_alpha', 'angle_beta', 'angle_gamma')
+}
+_BREAKS = r'\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029'
+_TITLE_RE = re.compile(rf'\s*([^{_BREAKS}]*)')
+_LINE_RE = re.compile(rf'(?:^|(?<=[{_BREAKS}]))[^\S{_BREAKS}]*([^\s#][^{_BREAKS}]*)')
+_LABEL_STRIP = str.maketrans('', '', '0123456789_-+.')
+_CIF_ROW = "  %s %.6f %.6f %.6f".__mod__
+
 def vector_norm(v):
-    return math.sqrt(sum(x**2 for x in v))
+    return math.hypot(*v)
 
 def dot_product(v1, v2):
-    return sum(x*y for x, y in zip(v1, v2))
+    try:
+        if len(v1) == len(v2) == 3:
+            return v1[0]*v2[0] + v1[1]*v2[1] + v1[2]*v2[2]
+    except TypeError:
+        pass
+    return sum(map(operator.mul, v1, v2))
+
+def _cross_norm(u, v):
+    (ux, uy, uz), (vx, vy, vz) = u, v
+    return math.hypot(uy*vz - uz*vy, uz*vx - ux*vz, ux*vy - uy*vx)
 
 def angle_between(v1, v2):
     dot = dot_product(v1, v2)
-    norm1 = vector_norm(v1)
-    norm2 = vector_norm(v2)
-    cos_angle = dot / (norm1 * norm2)
-    cos_angle = max(min(cos_angle, 1.0), -1.0)
-    return math.degrees(math.acos(cos_angle))
+    n2 = dot_product(v1, v1) * dot_product(v2, v2)
+    if n2 == 0.0:
+        raise ZeroDivisionError("angle with a zero-length vector is undefined")
+    if len(v1) == len(v2) == 3:
+        cross = _cross_norm(v1, v2)
+    else:
+        cross = math.sqrt(max(n2 - dot * dot, 0.0))
+    return math.atan2(cross, dot) * _RAD2DEG
+
+def _parse3(s):
+    a, b, c, *_ = s.split(None, 3)
+    return (float(a), float(b), float(c))
+
+def _cell_params(L):
+    a_vec, b_vec, c_vec = L
+    (ax, ay, az), (bx, by, bz), (cx, cy, cz) = L
+    a = math.sqrt(ax*ax + ay*ay + az*az)
+    b = math.sqrt(bx*bx + by*by + bz*bz)
+    c = math.sqrt(cx*cx + cy*cy + cz*cz)
+    if a == 0.0 or b == 0.0 or c == 0.0:
+        raise ValueError("POSCAR lattice contains a zero-length vector")
+    alpha = math.atan2(_cross_norm(b_vec, c_vec), bx*cx + by*cy + bz*cz) * _RAD2DEG
+    beta = math.atan2(_cross_norm(a_vec, c_vec), ax*cx + ay*cy + az*cz) * _RAD2DEG
+    gamma = math.atan2(_cross_norm(a_vec, b_vec), ax*bx + ay*by + az*bz) * _RAD2DEG
+    return a, b, c, alpha, beta, gamma
 
 def poscar_to_cif(poscar):
     lines = poscar.strip().splitlines()
     title = lines[0]
     scale = float(lines[1].strip())
-    lattice = [list(map(float, lines[i].split())) for i in range(2, 5)]
-    a_vec, b_vec, c_vec = [[scale * x for x in v] for v in lattice]
-
-    a_len = vector_norm(a_vec)
-    b_len = vector_norm(b_vec)
-    c_len = vector_norm(c_vec)
-
-    alpha = angle_between(b_vec, c_vec)
-    beta = angle_between(a_vec, c_vec)
-    gamma = angle_between(a_vec, b_vec)
+    L = [[scale * x for x in _parse3(lines[i])] for i in (2, 3, 4)]
+    a_len, b_len, c_len, alpha, beta, gamma = _cell_params(L)
 
     atom_types = lines[5].split()
     atom_counts = list(map(int, lines[6].split()))
     coord_start = 8
-    coords = [list(map(float, lines[i].split()[:3])) for i in range(coord_start, coord_start + sum(atom_counts))]
+    total = sum(atom_counts)
+    coords = [_parse3(line) for line in lines[coord_start:coord_start + total]]
+    if len(coords) != total:
+        raise ValueError(f"POSCAR declares {total} atoms but has {len(coords)} coordinate lines")
+    labels = [atom + n for atom, count in zip(atom_types, atom_counts) for n in map(str, range(1, count + 1))]
 
     cif_lines = []
     cif_lines.append(f"{title.replace(' ', '_')}")
@@ -51,59 +90,44 @@ def poscar_to_cif(poscar):
     cif_lines.append("  _atom_site_fract_y")
     cif_lines.append("  _atom_site_fract_z")
 
-    idx = 0
-    for atom, count in zip(atom_types, atom_counts):
-        for i in range(count):
-            x, y, z = coords[idx]
-            cif_lines.append(f"  {atom}{i+1} {x:.6f} {y:.6f} {z:.6f}")
-            idx += 1
+    cif_lines.extend(_CIF_ROW((label, x, y, z)) for label, (x, y, z) in zip(labels, coords))
 
     return "\n".join(cif_lines)
 
 def cif_to_poscar(cif):
-    lines = cif.strip().splitlines()
-    
-    title = lines[0]
+    title = _TITLE_RE.match(cif).group(1)
+    if not title:
+        raise ValueError("CIF input is empty")
     if title.startswith("data_"):
         title = title[5:]
     
-    a = b = c = 1.0
-    alpha = beta = gamma = 90.0
+    cell = {
+        'length_a': 1.0, 'length_b': 1.0, 'length_c': 1.0,
+        'angle_alpha': 90.0, 'angle_beta': 90.0, 'angle_gamma': 90.0,
+    }
     
     atoms_data = []
     in_loop = False
     columns = []
     
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue
+    for m in _LINE_RE.finditer(cif):
+        tokens = m.group(1).split()
+        key = tokens[0]
         
-        if re.search(r'[_*]cell[_*]length_a', line):
-            a = float(line.split()[-1])
-        elif re.search(r'[_*]cell[_*]length_b', line):
-            b = float(line.split()[-1])
-        elif re.search(r'[_*]cell[_*]length_c', line):
-            c = float(line.split()[-1])
-        elif re.search(r'[_*]cell[_*]angle_alpha', line):
-            alpha = float(line.split()[-1])
-        elif re.search(r'[_*]cell[_*]angle_beta', line):
-            beta = float(line.split()[-1])
-        elif re.search(r'[_*]cell[_*]angle_gamma', line):
-            gamma = float(line.split()[-1])
+        if key in _CELL_KEYS:
+            cell[_CELL_KEYS[key]] = float(tokens[-1])
         
-        elif line.startswith("loop_"):
+        elif key.startswith("loop_"):
             in_loop = True
             columns = []
             continue
         
-        elif in_loop and (line.startswith("_") or line.startswith("*")):
-            columns.append(line)
+        elif in_loop and key[0] in "_*":
+            columns.append(key)
         
-        elif in_loop and not (line.startswith("_") or line.startswith("*") or line.startswith("loop_")):
-            values = line.split()
-            if len(values) >= 4:
-                atoms_data.append(values)
+        elif in_loop:
+            if len(tokens) >= 4:
+                atoms_data.append(tokens)
     
     type_idx = -1
     x_idx = -1
@@ -130,37 +154,37 @@ def cif_to_poscar(cif):
     species = {}
     coords = []
     
-    for data in atoms_data:
-        if type_idx != -1 and type_idx < len(data):
-            element = data[type_idx]
-        elif label_idx != -1 and label_idx < len(data):
-            element = ''.join(c for c in data[label_idx] if not c.isdigit())
-        else:
-            continue
-        
-        if x_idx != -1 and y_idx != -1 and z_idx != -1 and x_idx < len(data) and y_idx < len(data) and z_idx < len(data):
-            try:
-                x = float(data[x_idx])
-                y = float(data[y_idx])
-                z = float(data[z_idx])
-                coords.append([x, y, z])
-                species[element] = species.get(element, 0) + 1
-            except ValueError:
+    if x_idx != -1 and y_idx != -1 and z_idx != -1:
+        xyz_end = max(x_idx, y_idx, z_idx)
+        for data in atoms_data:
+            if type_idx != -1 and type_idx < len(data):
+                element = data[type_idx]
+            elif label_idx != -1 and label_idx < len(data):
+                element = data[label_idx].translate(_LABEL_STRIP)
+            else:
                 continue
+            
+            if xyz_end < len(data):
+                try:
+                    coords.append((float(data[x_idx]), float(data[y_idx]), float(data[z_idx])))
+                except ValueError:
+                    continue
+                species[element] = species.get(element, 0) + 1
     
-    poscar = f"{title}\n1.0\n"
-    
-    poscar += f"{a:.6f} 0.0 0.0\n"
-    poscar += f"0.0 {b:.6f} 0.0\n"
-    poscar += f"0.0 0.0 {c:.6f}\n"
-    
-    poscar += " ".join(species.keys()) + "\n"
-    poscar += " ".join(str(v) for v in species.values()) + "\n"
+    a, b, c = cell['length_a'], cell['length_b'], cell['length_c']
     
-    poscar += "Direct\n"
-    for coord in coords:
-        poscar += f"{coord[0]:.6f} {coord[1]:.6f} {coord[2]:.6f}\n"
+    out = [
+        title,
+        "1.0",
+        f"{a:.6f} 0.0 0.0",
+        f"0.0 {b:.6f} 0.0",
+        f"0.0 0.0 {c:.6f}",
+        " ".join(species),
+        " ".join(map(str, species.values())),
+        "Direct",
+    ]
+    out.extend(f"{x:.6f} {y:.6f} {z:.6f}" for x, y, z in coords)
     
-    return poscar
+    return "\n".join(out) + "\n"
 
 __all__ = ['poscar_to_cif', 'cif_to_poscar', 'vector_norm', 'dot_product', 'angle_between']
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python'))
+
+from converter import cif_to_poscar
+
+CIF = """data_test
+_cell_length_a 3.0
+_cell_length_b 4.0
+_cell_length_c 5.0
+{indent}loop_
+_atom_site_label
+_atom_site_fract_x
+_atom_site_fract_y
+_atom_site_fract_z
+Si1 0.0 0.0 0.0
+O1 0.5 0.5 0.5
+"""
+
+def test_cif_loop_indented_with_form_feed_or_vertical_tab():
+    for indent in ("\f", "\v", " \f\t"):
+        lines = cif_to_poscar(CIF.format(indent=indent)).splitlines()
+        assert lines[5:] == [
+            "Si O",
+            "1 1",
+            "Direct",
+            "0.000000 0.000000 0.000000",
+            "0.500000 0.500000 0.500000",
+        ]